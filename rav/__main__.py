@@ -1,9 +1,35 @@
-import fire
+import sys
 
-from rav.cli import RavCLI
+
+def run_fast_path(argv):
+    """
+    Handle the common ``rav run <cmd> [args...]`` invocation without
+    importing fire. Returns True when the invocation was dispatched.
+    """
+    rest = list(argv[1:])
+    project_file = "rav.yaml"
+    if rest[:1] == ["-f"] or rest[:1] == ["--file"]:
+        if len(rest) < 2:
+            return False
+        project_file = rest[1]
+        rest = rest[2:]
+    if not rest or rest[0].startswith("-"):
+        return False
+    from rav.cli import RavCLI
+
+    RavCLI(project_file=project_file).run(rest[0], *rest[1:])
+    return True
 
 
 def main():
+    argv = sys.argv[1:]
+    if argv and argv[0] in ("run", "x") and "--help" not in argv:
+        if run_fast_path(argv):
+            return
+    import fire
+
+    from rav.cli import RavCLI
+
     fire.Fire(RavCLI)
 
 
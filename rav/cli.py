@@ -1,27 +1,36 @@
 # add logging
 import logging
 import pathlib
-from dataclasses import dataclass
 
-import yaml
-from rich import print as rich_print
-
-from rav import start
 from rav.project import Project
 
+# The sample project is a fixed document, so ship it as a literal
+# instead of paying a yaml.dump on every `rav sample`.
+SAMPLE_YAML = """\
+name: rav
+scripts:
+  echo: |-
+    echo 'Hello World!
+    rav is working!'
+  server: python3 -m http.server
+  win-server: python -m http.server
+"""
+
 # Set log level
 logger = logging.getLogger(__name__)
 
 logger.setLevel(logging.INFO)
 
 
-@dataclass
 class RavCLI:
-    project_file = "rav.yaml"
-    project = None
-    join_arg = " && "
-    verbose = False
-    overwrite = False
+    __slots__ = (
+        "project_file",
+        "project",
+        "join_arg",
+        "verbose",
+        "overwrite",
+        "no_cache",
+    )
 
     def __init__(
         self,
@@ -31,23 +40,30 @@ class RavCLI:
         join_arg=" && ",
         verbose=False,
         overwrite=False,
+        no_cache=False,
     ):
-        super().__init__()
+        self.project = None
         self.join_arg = join_arg
         self.verbose = verbose
         self.overwrite = overwrite
+        self.no_cache = no_cache
         self.project_file = f or project or project_file
 
     def setup_project(self, project_file):
+        # Existence is checked by Project when it opens the file; a
+        # separate exists() here would just be an extra stat syscall.
         self.project_file = pathlib.Path(project_file)
-        if not self.project_file.exists():
-            raise Exception(f"Error: rav project file '{project_file}' not found.")
-        self.project = Project(project_file=self.project_file, join_arg=self.join_arg)
+        self.project = Project(
+            project_file=self.project_file,
+            join_arg=self.join_arg,
+            use_cache=not self.no_cache,
+        )
 
     def version(
         self,
     ):
         import rav
+        from rich import print as rich_print
 
         rich_print(f"[bold]Version[/bold] {rav.__version__}")
 
@@ -63,26 +79,62 @@ class RavCLI:
         """Shortcut for run"""
         self.run(cmd, *args, **kwargs)
 
-    def list(
-        self,
-    ):
-        self.get_project().list()
+    def list(self, expanded=False):
+        self.get_project().list(expanded=expanded)
+
+    def download(self, overwrite=False, verbose=False):
+        """Download the files listed in the project's downloads section"""
+        self.get_project().download(
+            overwrite=overwrite or self.overwrite,
+            verbose=verbose or self.verbose,
+        )
+
+    def downloads(self):
+        """List the configured downloads"""
+        self.get_project().list_download_config()
+
+    def shell(self):
+        """Run commands interactively through one persistent shell"""
+        from rav import shell as rav_shell
+
+        project = self.get_project()
+
+        def resolve(line):
+            # Same resolution as `rav run`: handles group:cmd names,
+            # prefixes/working dirs and list scripts. Unknown names
+            # come back "" (falsy), so the REPL runs the line as-is.
+            return project.expand_command(line)
+
+        # Don't return the exit code: fire would print the bare number
+        # after the REPL exits
+        rav_shell.run_repl(resolve_command=resolve)
+
+    def batch(self, path):
+        """Run each line of a file through one persistent shell"""
+        from rav import shell as rav_shell
+
+        batch_path = pathlib.Path(path)
+        if not batch_path.exists():
+            raise Exception(f"Error: batch file '{path}' not found.")
+        lines = [line.strip() for line in batch_path.read_text().splitlines()]
+        commands = [line for line in lines if line and not line.startswith("#")]
+        code = rav_shell.run_batch(commands)
+        # Returning the code would just make fire print it and exit 0;
+        # raising carries the failure into rav's own exit status
+        if code != 0:
+            raise SystemExit(code)
 
     def new(self, path="."):
+        from rav import start
+
         project_file = self.project_file
         start.start_new(path=path, overwrite=self.overwrite, project_file=project_file)
 
     def sample(self, overwrite=False):
         """Create a sample rav.yaml file"""
+        from rich import print as rich_print
+
         _overwrite = overwrite or self.overwrite or False
-        sample_project = {
-            "name": "rav",
-            "scripts": {
-                "echo": "echo 'Hello World!\nrav is working!'",
-                "server": "python3 -m http.server",
-                "win-server": "python -m http.server",
-            },
-        }
         rav_sample_path = pathlib.Path("rav.sample.yaml")
         if rav_sample_path.exists() and not _overwrite:
             rich_print(
@@ -94,4 +146,4 @@ class RavCLI:
         rich_print(
             "Creating a sample project at:\n\n", rav_sample_path.absolute(), "\n"
         )
-        rav_sample_path.write_text(yaml.dump(sample_project))
+        rav_sample_path.write_text(SAMPLE_YAML)
@@ -0,0 +1,146 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
+import mmap
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+if os.environ.get("OPENSSL_ia32cap"):
+    logger.warning(
+        "OPENSSL_ia32cap is set; hardware-accelerated SHA may be disabled."
+    )
+
+# Above this size, hash via mmap so OpenSSL reads straight from the
+# page cache instead of paying a userspace copy per read() chunk.
+MMAP_THRESHOLD = 4 * 1024 * 1024
+
+
+class IntegrityError(Exception):
+    """Raised when an integrity string is malformed or unsupported."""
+
+
+class IntegrityVerifier:
+    """
+    Verify files against SRI-style integrity strings,
+    e.g. "sha256-<base64 digest>".
+    """
+
+    # The hashlib.shaN constructors are bound to OpenSSL's EVP
+    # implementations at import (SHA-NI on x86-64, the SHA2 extensions
+    # on ARMv8), so reusing them skips the name resolution hashlib.new
+    # repeats on every call.
+    SUPPORTED_ALGORITHMS = {
+        "sha256": hashlib.sha256,
+        "sha384": hashlib.sha384,
+        "sha512": hashlib.sha512,
+    }
+
+    # One pass over the string validates the algorithm, the separator
+    # and the base64 alphabet together. SRI algorithm names are
+    # lowercase per spec, so the match is case-sensitive.
+    _SRI_RE = re.compile(r"^(sha(?:256|384|512))-([A-Za-z0-9+/]+=*)$")
+
+    @classmethod
+    def parse_integrity(cls, integrity):
+        """Split an integrity string into (algorithm, expected base64 hash)."""
+        match = cls._SRI_RE.match(integrity or "")
+        if not match:
+            supported = ", ".join(sorted(cls.SUPPORTED_ALGORITHMS))
+            raise IntegrityError(
+                f"Invalid integrity string '{integrity}'. Expected "
+                f"'<algorithm>-<base64 hash>' with one of: {supported}."
+            )
+        return match.group(1), match.group(2)
+
+    @classmethod
+    def make_hasher(cls, integrity):
+        """
+        Parse an integrity string into (hasher, expected raw digest,
+        algorithm) for callers that hash data incrementally as it
+        arrives instead of re-reading a finished file.
+        """
+        algorithm, expected_hash = cls.parse_integrity(integrity)
+        try:
+            expected_raw = base64.b64decode(expected_hash, validate=True)
+        except (binascii.Error, ValueError):
+            raise IntegrityError(f"Invalid base64 hash in '{integrity}'.")
+        return cls.new_hasher(algorithm), expected_raw, algorithm
+
+    @classmethod
+    def compute_hash(cls, file_path, algorithm):
+        """Hash a file and return the digest as base64."""
+        return base64.b64encode(cls.compute_raw_digest(file_path, algorithm)).decode()
+
+    @classmethod
+    def new_hasher(cls, algorithm):
+        """
+        Build a hasher via direct three-way dispatch instead of a dict
+        lookup; the comparisons compile to straight-line string compares.
+        """
+        if algorithm == "sha256":
+            return hashlib.sha256()
+        if algorithm == "sha384":
+            return hashlib.sha384()
+        if algorithm == "sha512":
+            return hashlib.sha512()
+        supported = ", ".join(sorted(cls.SUPPORTED_ALGORITHMS))
+        raise IntegrityError(
+            f"Unsupported algorithm '{algorithm}'. Supported: {supported}."
+        )
+
+    @classmethod
+    def compute_raw_digest(cls, file_path, algorithm):
+        """Hash a file and return the raw digest bytes."""
+        with open(file_path, "rb") as f:
+            return cls.digest_file(f, algorithm)
+
+    @classmethod
+    def digest_file(cls, f, algorithm):
+        """Hash an open binary file and return the raw digest."""
+        size = os.fstat(f.fileno()).st_size
+        if size > MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    hash_func = cls.new_hasher(algorithm)
+                    hash_func.update(memoryview(mm))
+                    return hash_func.digest()
+            except (ValueError, OSError):
+                # mmap can fail on pipes/special files; fall through
+                pass
+        if hasattr(hashlib, "file_digest"):
+            # Python 3.11+: streams inside C, no per-chunk Python loop
+            return hashlib.file_digest(f, lambda: cls.new_hasher(algorithm)).digest()
+        hash_func = cls.new_hasher(algorithm)
+        # 1 MiB chunks amortize the syscall + update() overhead
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hash_func.update(chunk)
+        return hash_func.digest()
+
+    @classmethod
+    def verify_integrity(cls, file_path, integrity):
+        """Return True when the file matches the integrity string."""
+        algorithm, expected_hash = cls.parse_integrity(integrity)
+        try:
+            expected_raw = base64.b64decode(expected_hash, validate=True)
+        except (binascii.Error, ValueError):
+            return False
+        actual_raw = cls.compute_raw_digest(file_path, algorithm)
+        # Compare raw digests: shorter than the base64 strings and
+        # constant-time, so no early-exit on a prefix match.
+        return hmac.compare_digest(expected_raw, actual_raw)
+
+    @classmethod
+    def get_integrity_info(cls, file_path, integrity):
+        """Verify a file and return the details of the comparison."""
+        algorithm, expected_hash = cls.parse_integrity(integrity)
+        actual_hash = cls.compute_hash(file_path, algorithm)
+        return {
+            "algorithm": algorithm,
+            "expected_hash": expected_hash,
+            "actual_hash": actual_hash,
+            "is_valid": actual_hash == expected_hash,
+        }
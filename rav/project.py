@@ -1,27 +1,169 @@
+import base64
+import hashlib
+import hmac
+import os
 import pathlib
+import pickle
+import re
 import subprocess
-from dataclasses import dataclass
+import sys
+import threading
+from collections import ChainMap
 
 import yaml
 from rich import print as rich_print
-from rich.pretty import pprint as rich_pprint
-from rich.table import Table
+
+# Prefer the libyaml C loader when PyYAML was built against it.
+# It parses the same documents ~10x faster than the pure-Python loader.
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+def make_session(pool_size=8, per_host=None):
+    """
+    A requests session with keep-alive pooling and retries, so
+    same-host downloads reuse one TCP/TLS connection instead of paying
+    a handshake per file. `per_host` caps connections to one host
+    (blocking workers rather than opening more); the retry policy backs
+    off exponentially and honors Retry-After on 429s.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=per_host or pool_size,
+        pool_block=per_host is not None,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=(429, 500, 502, 503, 504),
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Serializes worker output so concurrent downloads don't interleave
+_print_lock = threading.Lock()
+
+
+def _locked_print(*args, **kwargs):
+    with _print_lock:
+        rich_print(*args, **kwargs)
+
+
+def _noop(*args, **kwargs):
+    pass
+
+
+# Command lists longer than this run from a temp script file instead
+# of one giant joined shell line
+_SCRIPT_FILE_THRESHOLD = 5
+
+# Characters that force a command through the shell: operators,
+# substitution, globbing, quoting. Anything else can exec directly.
+_SHELL_META = frozenset("&|;<>$`*?~#()[]{}\"'\\\n")
+
+
+def _needs_shell(command):
+    """Whether a command string relies on shell features."""
+    if any(ch in _SHELL_META for ch in command):
+        return True
+    # A leading VAR=value assignment is shell syntax too
+    first, _, _ = command.lstrip().partition(" ")
+    return not first or "=" in first
+
+# Keys whose presence marks a script entry as a group definition
+_GROUP_KEYS = ("prefix", "working_dir", "cmd")
+
+# Matches ${{ vars.NAME }} placeholders; compiled once at import.
+_VAR_RE = re.compile(r"\$\{\{\s*vars\.([a-zA-Z_][a-zA-Z0-9_]*)\s*\}\}")
+
+
+def get_cache_dir():
+    """Directory used to cache parsed project files."""
+    base = os.environ.get("XDG_CACHE_HOME") or pathlib.Path.home() / ".cache"
+    return pathlib.Path(base) / "rav"
+
+
+# Cache serializer: msgspec (then orjson) decode small dicts in C far
+# faster than pickle's opcode interpreter. Both are optional; pickle is
+# the stdlib fallback. The suffix keys the on-disk format so a cache
+# written by one serializer is never read by another.
+try:
+    from msgspec import msgpack as _msgpack
+
+    CACHE_SUFFIX = ".msgpack"
+    _cache_dumps = _msgpack.encode
+    _cache_loads = _msgpack.decode
+except ImportError:
+    try:
+        import orjson as _orjson
+
+        CACHE_SUFFIX = ".json"
+
+        def _cache_dumps(obj):
+            # Without the passthrough, orjson would serialize YAML
+            # date/datetime values itself and warm-cache runs would see
+            # str where cold runs saw date. With it (and no `default`),
+            # such documents raise TypeError and skip the cache, like
+            # the other serializers.
+            return _orjson.dumps(obj, option=_orjson.OPT_PASSTHROUGH_DATETIME)
+
+        _cache_loads = _orjson.loads
+    except ImportError:
+        CACHE_SUFFIX = ".pkl"
+
+        def _cache_dumps(obj):
+            return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+        _cache_loads = pickle.loads
+
+
+# In-process memo in front of the on-disk cache, keyed like the cache
+# file: repeated Project instantiations in one process (wizards, REPLs)
+# skip even the cache-file read. A handful of entries at most, so a
+# plain dict beats lru_cache bookkeeping here.
+_project_memo = {}
 
 
-@dataclass
 class Project:
     """
     A rav project in the current directory.
     """
 
-    join_arg: str = " && "
-    _file: pathlib.Path = None
-    _project: dict = None
+    # Fixed slots keep instances small and make attribute access a
+    # direct offset load instead of a dict lookup.
+    __slots__ = (
+        "join_arg",
+        "_file",
+        "_project",
+        "_scripts",
+        "_downloads",
+        "_groups",
+        "_command_set",
+        "_joined_scripts",
+        "_variables_cache",
+        "use_cache",
+        "cwd",
+    )
 
-    def __init__(self, project_file: pathlib.Path, join_arg: str = " && "):
-        super().__init__()
+    def __init__(
+        self,
+        project_file: pathlib.Path,
+        join_arg: str = " && ",
+        use_cache: bool = True,
+    ):
         self.join_arg = join_arg
         self._file = project_file
+        self.use_cache = use_cache
+        self._variables_cache = None
         # Use pathlib to get current working directory
         self.cwd = pathlib.Path.cwd()
 
@@ -30,57 +172,630 @@ class Project:
         rich_print(f"Using [bold green]{project_file}[/bold green]\n")
 
         # Open project file and load YAML
-        if self._file.exists():
-            yaml_data = self._file.read_text()
-            self._project = yaml.safe_load(yaml_data)
+        self._project = self.load_project()
+
+        # Resolve the scripts mapping once; `rav` wins over `scripts`
+        # over `commands` (see README).
+        self._scripts = (
+            (
+                self._project.get("rav")
+                or self._project.get("scripts")
+                or self._project.get("commands")
+                or {}
+            )
+            if self._project
+            else {}
+        )
+
+        # Downloads config resolved the same way, once
+        self._downloads = (
+            (self._project.get("downloads") or {}) if self._project else {}
+        )
+
+        # Pre-build the group map so lookups during run/list are O(1).
+        # str() guards against non-string keys: YAML parses `on:`,
+        # `yes:` or `8080:` into bool/int keys, and run() always looks
+        # names up by string.
+        self._groups = {
+            str(name).rstrip(":"): value
+            for name, value in self._scripts.items()
+            if self.is_group_definition(value)
+        }
+
+        # Every runnable name (including group:sub), for O(1) validity
+        # checks and close-match suggestions
+        command_names = set()
+        for name, value in self._scripts.items():
+            if self.is_group_definition(value):
+                base = str(name).rstrip(":")
+                sub_commands = value.get("cmd")
+                if isinstance(sub_commands, dict):
+                    command_names.update(f"{base}:{s}" for s in sub_commands)
+                elif sub_commands is not None:
+                    command_names.add(base)
+            else:
+                # str() so difflib can measure every candidate; YAML
+                # can yield bool/int keys
+                command_names.add(str(name))
+        self._command_set = frozenset(command_names)
+
+        # Args-free runs are the common case: pre-join plain scripts so
+        # run() skips the per-call list build and join. Lists past the
+        # script-file threshold stay out so they keep that path.
+        self._joined_scripts = {}
+        for name, value in self._scripts.items():
+            if isinstance(value, str):
+                self._joined_scripts[name] = value
+            elif (
+                isinstance(value, list)
+                and len(value) <= _SCRIPT_FILE_THRESHOLD
+                and all(isinstance(c, str) for c in value)
+            ):
+                self._joined_scripts[name] = self.join_commands(value)
+
+    def cache_path(self, st=None):
+        """Cache location for this project file, keyed on path + mtime + size."""
+        if st is None:
+            st = self._file.stat()
+        raw_key = f"{self._file.resolve()}:{st.st_mtime_ns}:{st.st_size}"
+        key = hashlib.blake2b(raw_key.encode()).hexdigest()
+        return get_cache_dir() / f"{key}{CACHE_SUFFIX}"
+
+    def load_project(self):
+        """
+        Load and parse the project file.
+
+        The parsed document is cached on disk so repeat invocations
+        skip the YAML parse entirely until the file changes.
+        """
+        # Open straight away instead of a separate exists() check: one
+        # syscall fewer, and fstat on the handle covers the cache key.
+        # Binary mode lets libyaml decode the bytes itself.
+        try:
+            fh = open(self._file, "rb")
+        except FileNotFoundError:
+            raise SystemExit(f"Error: rav project file '{self._file}' not found.")
+        with fh:
+            cache_path = None
+            memo_key = None
+            if self.use_cache:
+                st = os.fstat(fh.fileno())
+                memo_key = (str(self._file), st.st_mtime_ns, st.st_size)
+                if memo_key in _project_memo:
+                    return _project_memo[memo_key]
+                cache_path = self.cache_path(st)
+                if cache_path.exists():
+                    try:
+                        project = _cache_loads(cache_path.read_bytes())
+                        _project_memo[memo_key] = project
+                        return project
+                    except Exception:
+                        # Corrupt or stale cache; fall through to a parse
+                        pass
+            project = yaml.load(fh, Loader=SafeLoader)
+        if cache_path is not None:
+            self.write_cache(cache_path, project)
+            _project_memo[memo_key] = project
+        return project
+
+    def write_cache(self, cache_path, project):
+        import tempfile
+
+        # Write-temp + rename so a concurrent rav never reads a partial cache
+        try:
+            data = _cache_dumps(project)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=cache_path.parent)
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, cache_path)
+        except (OSError, TypeError, ValueError):
+            # Unserializable documents (e.g. YAML dates) just skip the cache
+            pass
 
     def detail(self):
+        from rich.pretty import pprint as rich_pprint
+
         rich_pprint(self._project)
 
     def scripts(self):
-        return (
-            self._project.get("rav")
-            or self._project.get("scripts")
-            or self._project.get("commands")
-            or {}
+        return self._scripts
+
+    def get_variables(self):
+        """
+        Variables available to ${{ vars.NAME }} placeholders: the
+        `vars`/`variables` mapping from the project file, which wins
+        over the process environment.
+
+        Neither changes within a run, so the merged mapping is built
+        once and reused.
+        """
+        if self._variables_cache is not None:
+            return self._variables_cache
+        yaml_vars = (
+            (self._project.get("vars") or self._project.get("variables") or {})
+            if self._project
+            else {}
         )
+        yaml_str_vars = {key: str(value) for key, value in yaml_vars.items()}
+        # ChainMap gives YAML-wins precedence without copying os.environ
+        self._variables_cache = ChainMap(yaml_str_vars, os.environ)
+        return self._variables_cache
+
+    def substitute_variables(self, value):
+        """Expand ${{ vars.NAME }} placeholders in a command string."""
+        if not isinstance(value, str):
+            return value
+        # Most commands have no placeholders; skip the regex entirely
+        if "${{" not in value:
+            return value
+        variables = self.get_variables()
+
+        def replace_var(match):
+            name = match.group(1)
+            if name in variables:
+                return variables[name]
+            # Leave unknown placeholders untouched
+            return match.group(0)
+
+        return _VAR_RE.sub(replace_var, value)
+
+    def is_group_definition(self, value):
+        """
+        Group definitions are dict-valued scripts carrying any of the
+        group keys (prefix/working_dir/cmd).
+        """
+        # any() over the key tuple allocates nothing and short-circuits,
+        # unlike building two sets and intersecting them
+        return isinstance(value, dict) and any(k in value for k in _GROUP_KEYS)
+
+    def get_group_config(self, name):
+        return self._groups.get(name)
+
+    def resolve_command_config(self, cmd):
+        """
+        Resolve a command name to (commands, prefix, working_dir), or
+        None when the name doesn't match a script or group command.
+        """
+        group_name, sep, sub_name = cmd.partition(":")
+        if sep:
+            group = self.get_group_config(group_name)
+            if group is None:
+                return None
+            sub_commands = group.get("cmd")
+            if not isinstance(sub_commands, dict) or sub_name not in sub_commands:
+                return None
+            return (
+                sub_commands[sub_name],
+                group.get("prefix"),
+                group.get("working_dir"),
+            )
+        value = self._scripts.get(cmd)
+        if value is None:
+            return None
+        if self.is_group_definition(value):
+            commands = value.get("cmd")
+            if commands is None or isinstance(commands, dict):
+                # A bare group name needs an explicit subcommand
+                return None
+            return commands, value.get("prefix"), value.get("working_dir")
+        return value, None, None
+
+    def apply_prefix_and_working_dir(self, commands, prefix=None, working_dir=None):
+        """
+        Expand variables in each command and apply the group's prefix
+        and working directory.
+        """
+        if isinstance(commands, str):
+            commands = [commands]
+        # prefix and working_dir are loop-invariant; expand them once
+        if prefix:
+            prefix = self.substitute_variables(prefix)
+        if working_dir:
+            working_dir = self.substitute_variables(working_dir)
+        processed = []
+        for cmd in commands:
+            cmd = self.substitute_variables(cmd)
+            if prefix:
+                cmd = f"{prefix} {cmd}"
+            processed.append(cmd)
+        if working_dir:
+            processed.insert(0, f"cd {working_dir}")
+        return processed
 
     def join_commands(self, commands):
-        return f"{self.join_arg}".join(commands)
+        return self.join_arg.join(commands)
 
     def list(self, expanded=False):
+        from rich.table import Table
+
         rich_print("Viewing available commands via [cyan]rav list[/cyan]")
         scripts = self.scripts()
         table = Table(show_header=True, header_style="bold magenta")
         table.add_column("Command", style="cyan")
         table.add_column("Script")
         for cmd, value in scripts.items():
-            if isinstance(value, list):
-                table.add_row(f"{cmd}", self.join_commands(value))
+            if self.is_group_definition(value):
+                name = str(cmd).rstrip(":")
+                sub_commands = value.get("cmd")
+                if isinstance(sub_commands, dict):
+                    for sub_name in sub_commands:
+                        full_name = f"{name}:{sub_name}"
+                        table.add_row(full_name, self.expand_command(full_name, expanded))
+                else:
+                    table.add_row(name, self.expand_command(name, expanded))
             else:
-                table.add_row(f"{cmd}", value)
+                shown = self.expand_command(str(cmd), expanded)
+                if not shown:
+                    # Names that don't resolve by string (e.g. YAML
+                    # bool/int keys) keep showing their raw value
+                    shown = (
+                        self.join_commands(value)
+                        if isinstance(value, list)
+                        else f"{value}"
+                    )
+                table.add_row(f"{cmd}", shown)
         rich_print()
         rich_print(table)
 
+    def expand_command(self, cmd, expanded=True):
+        """The full shell command a script name resolves to."""
+        resolved = self.resolve_command_config(cmd)
+        if resolved is None:
+            return ""
+        commands, prefix, working_dir = resolved
+        if not expanded:
+            if isinstance(commands, list):
+                return self.join_commands(commands)
+            return commands
+        processed = self.apply_prefix_and_working_dir(commands, prefix, working_dir)
+        return self.join_commands(processed)
+
     def run(self, cmd, *args, **kwargs):
-        scripts = self.scripts()
-        if cmd not in scripts:
+        resolved = self.resolve_command_config(cmd)
+        if resolved is None:
+            import difflib
+
             self.list()
             rich_print(
                 "\n----------------:warning: Error----------------\n",
                 f"[bold red]'{cmd}'[/bold red] is not a valid script. Review the valid ones above. or use [cyan]rav list[/cyan].",
             )
+            suggestions = difflib.get_close_matches(cmd, self._command_set, n=3)
+            if suggestions:
+                pretty = ", ".join(f"[cyan]{s}[/cyan]" for s in suggestions)
+                rich_print(f"Did you mean: {pretty}?")
             rich_print("---------------------------------------\n")
             return
-        commands = scripts[cmd]
+        if not args:
+            # Pre-joined at load time; only variable expansion is left
+            joined = self._joined_scripts.get(cmd)
+            if joined is not None:
+                commands = self.substitute_variables(joined)
+                rich_print(f"Running [bold green]{commands}[/bold green]")
+                self.exec_commands(commands)
+                return
+        commands, prefix, working_dir = resolved
+        args_str = (" " + " ".join(args)) if args else ""
+        # f-strings coerce non-string items (YAML ints like `- 8080`),
+        # matching how the pre-list code formatted commands
         if isinstance(commands, list):
-            if isinstance(args, tuple):
-                commands = [f'{cmd} {" ".join(args)}' for cmd in commands]
-            commands = self.join_commands(commands)
-        elif isinstance(commands, str):
-            if isinstance(args, tuple):
-                commands = f'{commands} {" ".join(args)}'
+            commands = [f"{c}{args_str}" for c in commands]
+        else:
+            commands = [f"{commands}{args_str}"]
+        processed = self.apply_prefix_and_working_dir(commands, prefix, working_dir)
+        if (
+            os.name == "posix"
+            and len(processed) > _SCRIPT_FILE_THRESHOLD
+            and self.join_arg.strip() == "&&"
+        ):
+            self.exec_command_script(processed)
+            return
+        commands = self.join_arg.join(processed)
         rich_print(f"Running [bold green]{commands}[/bold green]")
+        self.exec_commands(commands)
+
+    def exec_command_script(self, commands):
+        """
+        Run a long command list from a temp script under `set -e`
+        (equivalent to the `&&` join) instead of handing the shell one
+        very long line to re-parse; also sidesteps quoting pitfalls.
+        """
+        import tempfile
+
+        rich_print(f"Running [bold green]{len(commands)}[/bold green] commands")
+        fd, script = tempfile.mkstemp(suffix=".sh", prefix="rav-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write("set -e\n")
+                f.write("\n".join(commands))
+                f.write("\n")
+            result = subprocess.run(["sh", script])
+            if result.returncode != 0:
+                raise SystemExit(result.returncode)
+        finally:
+            os.unlink(script)
+
+    def get_download_config(self):
+        """The `downloads` section of the project file."""
+        return self._downloads
+
+    def list_download_config(self):
+        """Show the configured downloads."""
+        from rich.table import Table
+
+        config = self.get_download_config()
+        files = config.get("files") or []
+        if not files:
+            rich_print("No downloads configured.")
+            return
+        table = Table(show_header=True, header_style="bold magenta")
+        table.add_column("URL", style="cyan")
+        table.add_column("Filename")
+        table.add_column("Integrity")
+        for file in files:
+            table.add_row(
+                file.get("url") or "",
+                file.get("filename") or "",
+                file.get("integrity") or "",
+            )
+        rich_print()
+        rich_print(table)
+
+    def download(self, overwrite=False, verbose=False):
+        """
+        Download the files in the `downloads` section of the project file.
+
+        Files are fetched concurrently through one shared session (the
+        work is network-bound), responses are streamed to disk in chunks
+        so memory stays flat regardless of file size, and files with an
+        `integrity` entry are written to a `.part` file first and only
+        renamed into place once the hash matches.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        config = self.get_download_config()
+        files = config.get("files") or []
+        if not files:
+            rich_print(
+                "No downloads configured. Add a [cyan]downloads:[/cyan] "
+                "section to the project file."
+            )
+            return
+        destination = pathlib.Path(config.get("destination") or "downloads")
+        destination.mkdir(parents=True, exist_ok=True)
+        # Create per-file destination overrides once, up front: many
+        # files often share a directory, and doing it here keeps the
+        # stat+mkdir syscalls off the worker threads entirely
+        created_dirs = {destination}
+        for file in files:
+            override = file.get("destination")
+            if override:
+                override_path = pathlib.Path(override)
+                if override_path not in created_dirs:
+                    override_path.mkdir(parents=True, exist_ok=True)
+                    created_dirs.add(override_path)
+        downloaded_count = 0
+        skipped_count = 0
+        failed_count = 0
+        # Bound in-flight downloads so large file lists can't stampede
+        # a server; tune with `max_concurrency` / `per_host` in the
+        # downloads section
+        max_concurrency = int(config.get("max_concurrency") or 8)
+        per_host = config.get("per_host")
+        max_workers = max(1, min(max_concurrency, len(files)))
+        session = make_session(
+            pool_size=max_workers,
+            per_host=int(per_host) if per_host else None,
+        )
+        with session, ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(
+                    self._download_one,
+                    session,
+                    i,
+                    len(files),
+                    file,
+                    destination,
+                    overwrite,
+                    verbose,
+                )
+                for i, file in enumerate(files, 1)
+            ]
+            for future in as_completed(futures):
+                status = future.result()
+                if status == "downloaded":
+                    downloaded_count += 1
+                elif status == "skipped":
+                    skipped_count += 1
+                else:
+                    failed_count += 1
+        rich_print(
+            f"\nDownloaded [bold green]{downloaded_count}[/bold green], "
+            f"skipped [bold]{skipped_count}[/bold], "
+            f"failed [bold red]{failed_count}[/bold red] "
+            f"of {len(files)} file(s)."
+        )
+        # Scripts and CI must see integrity/HTTP failures in the exit
+        # code, not just the log
+        if failed_count:
+            raise SystemExit(1)
+
+    def _download_one(
+        self, session, index, total, file, destination, overwrite, verbose
+    ):
+        """
+        Fetch a single download entry. Returns "downloaded", "skipped"
+        or "failed". Runs on a worker thread.
+        """
+        import shutil
+        import tempfile
+
+        import requests
+
+        from rav.integrity import IntegrityError, IntegrityVerifier
+
+        # Buffer this file's lines and flush them in one console write
+        # at the end, so markup parsing and the stdout syscall happen
+        # once per file rather than once per line. Binding the verbose
+        # sink up front removes the `if verbose:` test at each call site
+        lines = []
+        log_verbose = lines.append if verbose else _noop
+        try:
+            url = file.get("url")
+            if not url:
+                lines.append(f"[{index}/{total}] [bold red]Missing url[/bold red]")
+                return "failed"
+            url = self.substitute_variables(url)
+            filename = file.get("filename") or url.rstrip("/").rsplit("/", 1)[-1]
+            destination_override = file.get("destination")
+            if destination_override:
+                # Already created (and deduplicated) by download()
+                destination_path = pathlib.Path(destination_override)
+            else:
+                destination_path = destination
+            final_download_path = destination_path / filename
+            # Check overwrite first so --overwrite skips the stat entirely
+            if not overwrite and final_download_path.exists():
+                log_verbose(
+                    f"[{index}/{total}] Skipping [cyan]{filename}[/cyan] "
+                    "(already exists, use --overwrite to re-download)"
+                )
+                return "skipped"
+            integrity = file.get("integrity")
+            hasher = None
+            expected_raw = None
+            algorithm = None
+            if integrity:
+                try:
+                    hasher, expected_raw, algorithm = IntegrityVerifier.make_hasher(
+                        integrity
+                    )
+                except IntegrityError as e:
+                    lines.append(f"[bold red]Integrity error[/bold red]: {e}")
+                    return "failed"
+                # Under --overwrite, hash any existing file first: a
+                # local disk read is far cheaper than re-fetching a
+                # file that already matches
+                if overwrite and final_download_path.exists():
+                    try:
+                        existing_raw = IntegrityVerifier.compute_raw_digest(
+                            final_download_path, algorithm
+                        )
+                    except OSError:
+                        existing_raw = None
+                    if existing_raw is not None and hmac.compare_digest(
+                        expected_raw, existing_raw
+                    ):
+                        lines.append(
+                            f"[{index}/{total}] [green]✓[/green] "
+                            f"[cyan]{filename}[/cyan] already verified "
+                            f"({algorithm}); skipping download"
+                        )
+                        return "skipped"
+                # A unique .part file next to the destination keeps the
+                # final rename on the same filesystem (atomic, no copy)
+                # and stops files with the same name clobbering each
+                # other mid-download
+                fd, temp_name = tempfile.mkstemp(
+                    dir=destination_path, prefix=filename + ".", suffix=".part"
+                )
+                download_path = pathlib.Path(temp_name)
+                out = os.fdopen(fd, "wb", buffering=1 << 20)
+            else:
+                download_path = final_download_path
+                out = open(download_path, "wb", buffering=1 << 20)
+            # Tell the kernel this is a one-shot sequential write so it
+            # can size readback/writeback accordingly (POSIX only)
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            lines.append(
+                f"[{index}/{total}] Downloading [cyan]{url}[/cyan] -> "
+                f"[green]{final_download_path}[/green]"
+            )
+            # Any exit before `completed` flips leaves a partial file;
+            # the finally below removes it, whatever the failure was
+            completed = False
+            try:
+                try:
+                    with session.get(url, stream=True, timeout=(5, 60)) as response:
+                        response.raise_for_status()
+                        with out as f:
+                            # 64 KiB chunks keep memory flat on large files
+                            if hasher is None:
+                                # No hashing: copy the raw stream without
+                                # materializing intermediate bytes objects
+                                response.raw.decode_content = True
+                                shutil.copyfileobj(response.raw, f, length=1 << 16)
+                            else:
+                                # Hashing the chunks as they arrive avoids a
+                                # second pass over the finished file
+                                for chunk in response.iter_content(
+                                    chunk_size=1 << 16
+                                ):
+                                    f.write(chunk)
+                                    hasher.update(chunk)
+                            # Drop already-written-back pages so large
+                            # downloads don't evict more useful cache;
+                            # best effort, dirty pages are left alone
+                            if hasattr(os, "posix_fadvise"):
+                                f.flush()
+                                os.posix_fadvise(
+                                    f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED
+                                )
+                except requests.RequestException as e:
+                    out.close()
+                    lines.append(f"[bold red]Download failed[/bold red]: {e}")
+                    return "failed"
+                if hasher is not None:
+                    actual_raw = hasher.digest()
+                    if not hmac.compare_digest(expected_raw, actual_raw):
+                        actual_hash = base64.b64encode(actual_raw).decode()
+                        lines.append(
+                            f"[bold red]Integrity mismatch[/bold red] for "
+                            f"[cyan]{filename}[/cyan]\n"
+                            f"  expected: "
+                            f"{base64.b64encode(expected_raw).decode()}\n"
+                            f"  actual:   {actual_hash}"
+                        )
+                        return "failed"
+                    log_verbose(f"  Integrity verified ({algorithm})")
+                    # replace() overwrites atomically; no exists/unlink
+                    # dance
+                    download_path.replace(final_download_path)
+                completed = True
+                return "downloaded"
+            finally:
+                if not completed:
+                    try:
+                        download_path.unlink()
+                    except OSError:
+                        pass
+        finally:
+            if lines:
+                _locked_print("\n".join(lines))
+
+    def exec_commands(self, commands):
+        """
+        Hand the joined command string to the shell.
+
+        On POSIX, replace the current process with the shell via execvp --
+        rav does nothing after the script finishes, so there is no reason
+        to keep a Python process alive just to wait on it.
+        """
+        if os.name == "posix":
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if not _needs_shell(commands):
+                # Plain commands exec directly, skipping the sh startup
+                # entirely. If the program is missing, fall through so
+                # the shell prints its usual "command not found".
+                argv = commands.split()
+                try:
+                    os.execvp(argv[0], argv)
+                except OSError:
+                    pass
+            os.execvp("/bin/sh", ["sh", "-c", commands])
         try:
             subprocess.run(commands, shell=True, check=True)
             rich_print("---------------------------------------")
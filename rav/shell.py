@@ -0,0 +1,87 @@
+import subprocess
+import sys
+
+from rich import print as rich_print
+
+
+class PersistentShell:
+    """
+    A single long-lived /bin/sh reused across many commands.
+
+    Spawning a fresh shell per command dominates the cost of short
+    commands; writing each command to one persistent shell and reading
+    until a sentinel marker avoids the per-command fork+exec entirely.
+    """
+
+    sentinel = "__RAV_EOT__"
+
+    def __init__(self, shell="/bin/sh"):
+        self.proc = subprocess.Popen(
+            [shell],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+
+    def run(self, command):
+        """Run one command, relay its output, return its exit code."""
+        self.proc.stdin.write(f'{command}\necho "{self.sentinel}$?"\n')
+        self.proc.stdin.flush()
+        for line in self.proc.stdout:
+            # The sentinel lands mid-line when the command's output has
+            # no trailing newline (printf, echo -n); find() instead of
+            # startswith() keeps such commands from hanging the loop
+            idx = line.find(self.sentinel)
+            if idx >= 0:
+                sys.stdout.write(line[:idx])
+                return int(line[idx + len(self.sentinel) :])
+            sys.stdout.write(line)
+        return self.proc.wait()
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.stdin.close()
+            self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def run_batch(commands, shell="/bin/sh"):
+    """Run an iterable of commands through one persistent shell."""
+    with PersistentShell(shell=shell) as sh:
+        for command in commands:
+            code = sh.run(command)
+            if code != 0:
+                rich_print(f"[bold red]Exited {code}[/bold red]: {command}")
+                return code
+    return 0
+
+
+def run_repl(resolve_command=None, shell="/bin/sh"):
+    """
+    Interactive loop over one persistent shell.
+
+    When `resolve_command` is given, each input line is first resolved
+    against the project scripts (so shortcut names keep working).
+    """
+    rich_print("[bold cyan]rav shell[/bold cyan] (exit with ctrl-d)")
+    with PersistentShell(shell=shell) as sh:
+        while True:
+            try:
+                line = input("rav> ").strip()
+            except (EOFError, KeyboardInterrupt):
+                print("")
+                return 0
+            if not line:
+                continue
+            if line in ("exit", "quit"):
+                return 0
+            if resolve_command is not None:
+                line = resolve_command(line) or line
+            sh.run(line)
@@ -2,6 +2,13 @@ import pathlib
 
 import yaml
 from rich import print as rich_print
+
+# Prefer the libyaml C dumper when PyYAML was built against it, same
+# as the loader selection in rav.project.
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
 from rich.console import Console
 from rich.prompt import Confirm, Prompt
 
@@ -97,7 +104,7 @@ def start_new(path=".", overwrite=False, project_file="rav.yaml"):
 
     """Create a sample rav.yaml file"""
     project_details = start_project_wizard(path=path)
-    new_output = yaml.dump(project_details)
+    new_output = yaml.dump(project_details, Dumper=SafeDumper)
     rich_print("Here is your new Rav project:\n")
     rich_print(new_output)
     final_confirm = "Save project?"
@@ -16,6 +16,7 @@ setup(
     install_requires=[
         "fire",
         "PyYAML",
+        "requests",
         "rich",
     ],
     python_requires=">=3.7",